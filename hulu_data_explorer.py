@@ -1,41 +1,250 @@
+import functools
+import json
+import os
+import shutil
+import numexpr as ne
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pycountry
 import streamlit as st
-from transformers import pipeline
+import torch
+from transformers import AutoTokenizer, pipeline
 from typing import Optional
-import matplotlib.pyplot as plt
 
-# Load dataset with basic cleaning and data type enforcement
+# Expected columns of the dataset and their types
+COLUMN_DTYPES = {
+    'title': 'string[pyarrow]',
+    'type': 'string[pyarrow]',
+    'genres': 'string[pyarrow]',
+    'releaseYear': 'Int32',
+    'imdbId': 'string[pyarrow]',
+    'imdbAverageRating': 'float64',
+    'imdbNumVotes': 'Int64',
+    'availableCountries': 'string[pyarrow]',
+}
+
+# Cheap fingerprint of the data file: replacing the file changes the key and invalidates the caches
+def get_data_signature(file_path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return file_path, stat.st_mtime, stat.st_size
+
+# Columns stored as categoricals: repeated strings become integer codes into a small deduplicated dictionary
+CATEGORY_COLUMNS = ('title', 'genres', 'availableCountries')
+
+# Cast the cleaned frame to its final dtypes. Shared by the CSV and Parquet paths, because Parquet
+# reads string columns back as Python-backed strings and category values as object.
+def apply_column_dtypes(data: pd.DataFrame) -> pd.DataFrame:
+    data = data.astype({
+        'type': 'string[pyarrow]',
+        'imdbId': 'string[pyarrow]',
+        'releaseYear': 'int32',
+        'imdbAverageRating': 'float64',
+        'imdbNumVotes': 'Int64',
+        **{column: 'category' for column in CATEGORY_COLUMNS},
+    })
+    for column in CATEGORY_COLUMNS:
+        categories = data[column].cat.categories
+        data[column] = data[column].cat.rename_categories(categories.astype('string[pyarrow]'))
+    return data
+
+# Split each distinct genre combination once with Arrow's string kernels (split on "," and trim
+# whitespace), then expand to one list per row through the category codes
+def split_genres(genres: pd.Series) -> list:
+    combinations = pa.array(genres.cat.categories.tolist(), type=pa.string())
+    split = pc.split_pattern(combinations, pattern=",")
+    trimmed = pa.ListArray.from_arrays(split.offsets, pc.utf8_trim_whitespace(split.flatten()))
+    return trimmed.take(pa.array(genres.cat.codes.to_numpy())).to_pylist()
+
+# Version of the cleaned frame stored in the Parquet cache; bump it whenever load_data's
+# columns or cleaning change so caches written by older code are rebuilt
+CACHE_VERSION = 3
+CACHE_METADATA_KEY = b"hulu_data_explorer"
+
+# Read the Parquet cache if it was written for the given cache key; None means parse the CSV instead
+def read_parquet_cache(parquet_path: str, cache_key: str) -> Optional[pd.DataFrame]:
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+        if metadata.get(CACHE_METADATA_KEY) != cache_key.encode():
+            return None
+        return pq.read_table(parquet_path).to_pandas()
+    except Exception:
+        # A missing, truncated or otherwise unreadable cache is simply rebuilt
+        return None
+
+# Write the Parquet cache to a temporary file and move it into place, so readers never see a partial file
+def write_parquet_cache(data: pd.DataFrame, parquet_path: str, cache_key: str) -> None:
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), CACHE_METADATA_KEY: cache_key.encode()}
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path, compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        # Failing to write the cache (e.g. read-only directory) should not stop the app
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Load dataset with basic cleaning and data type enforcement.
+# signature (from get_data_signature) keys both this cache and the Parquet cache, so a changed file is reloaded.
 @st.cache_data
-def load_data(file_path: str = "data.csv") -> pd.DataFrame:
+def load_data(file_path: str = "data.csv", signature: Optional[tuple] = None) -> pd.DataFrame:
     try:
-        data = pd.read_csv(file_path)
-        data['title'] = data['title'].fillna("Unknown Title").astype(str)
-        data['genres'] = data['genres'].fillna("Unknown Genre").astype(str)
-        data['releaseYear'] = data['releaseYear'].fillna(data['releaseYear'].median()).astype(int)
-        data['imdbAverageRating'] = data['imdbAverageRating'].fillna(data['imdbAverageRating'].mean())
-        data['availableCountries'] = data['availableCountries'].fillna("Unknown Country").astype(str)
+        # Reuse the Parquet copy written by a previous run only if it was built from this exact
+        # CSV (same path, mtime and size) by the current cache version
+        parquet_path = os.path.splitext(file_path)[0] + ".parquet"
+        if signature is None:
+            signature = get_data_signature(file_path)
+        cache_key = json.dumps({"version": CACHE_VERSION, "signature": signature})
+        data = read_parquet_cache(parquet_path, cache_key) if os.path.exists(parquet_path) else None
+        if data is not None:
+            data = apply_column_dtypes(data)
+        else:
+            # The pyarrow engine parses the CSV on multiple threads with compact types declared up front.
+            # usecols pins the expected schema; data.csv has no other columns, so it saves no parsing.
+            data = pd.read_csv(file_path, engine="pyarrow", usecols=list(COLUMN_DTYPES), dtype=COLUMN_DTYPES)
+            # Fill and cast all columns in one pass each instead of column by column
+            data = data.fillna({
+                'title': "Unknown Title",
+                'genres': "Unknown Genre",
+                'releaseYear': int(data['releaseYear'].median()),
+                'imdbAverageRating': data['imdbAverageRating'].mean(),
+                'availableCountries': "Unknown Country",
+            })
+            data = apply_column_dtypes(data)
+            # IMDb rating as stars, built for every row in one vectorized pass
+            data['stars'] = np.char.multiply("⭐", np.round(data['imdbAverageRating'].to_numpy()).astype(np.int8))
+            write_parquet_cache(data, parquet_path, cache_key)
+
+        # Per-row genre lists are derived from the categorical on both paths rather than cached,
+        # so they always come back as plain lists
+        data['genres_list'] = split_genres(data['genres'])
         return data
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
+# Unique individual genres for the sidebar, computed once per dataset.
+# The leading underscore keeps Streamlit from hashing the DataFrame; the data signature is the cache key.
+@st.cache_data
+def get_unique_genres(_data: pd.DataFrame, signature: tuple) -> np.ndarray:
+    genres = pc.list_flatten(pa.array(_data['genres_list']))
+    return pc.unique(genres).to_numpy(zero_copy_only=False)
+
+# Release year bounds and average rating, computed once per dataset
+@st.cache_data
+def get_data_stats(_data: pd.DataFrame, signature: tuple) -> tuple:
+    return int(_data['releaseYear'].min()), int(_data['releaseYear'].max()), _data['imdbAverageRating'].mean()
+
+# Reverse index from each individual genre to the row positions that list it,
+# grouped straight from the flattened genre lists
+@st.cache_data
+def get_genre_index(_data: pd.DataFrame, signature: tuple) -> dict:
+    genre_lists = pa.array(_data['genres_list'])
+    genres = pc.list_flatten(genre_lists).to_numpy(zero_copy_only=False)
+    rows = pc.list_parent_indices(genre_lists).to_numpy()
+    return {genre: rows[positions] for genre, positions in pd.Series(rows).groupby(genres).indices.items()}
+
+# Apply the sidebar filters: the genre index narrows the rows first, then year and rating are masked
+def filter_data(data: pd.DataFrame, genre_index: dict, genre_filter: list, release_year_range: tuple, min_rating: float) -> pd.DataFrame:
+    if genre_filter:
+        rows = np.unique(np.concatenate([genre_index.get(genre, np.empty(0, dtype=np.int64)) for genre in genre_filter]))
+        data = data.take(rows)
+    mask = (
+        (data['releaseYear'].between(*release_year_range)) &
+        (data['imdbAverageRating'] >= min_rating)
+    )
+    return data[mask]
+
+# Titles with the same genres and a comparable rating, evaluated as one fused numexpr pass.
+# Genres and titles are categorical, so the string comparisons become integer code comparisons.
+def find_similar_titles(data: pd.DataFrame, selected_content: dict) -> pd.DataFrame:
+    genres, titles = data['genres'].cat, data['title'].cat
+    mask = ne.evaluate(
+        "(genre_codes == genre_code) & (ratings >= min_rating) & (title_codes != title_code)",
+        local_dict={
+            "genre_codes": genres.codes.to_numpy(),
+            "genre_code": genres.categories.get_loc(selected_content['genres']),
+            "ratings": data['imdbAverageRating'].to_numpy(),
+            "min_rating": selected_content['imdbAverageRating'] - 0.5,
+            "title_codes": titles.codes.to_numpy(),
+            "title_code": titles.categories.get_loc(selected_content['title']),
+        },
+    )
+    return data[mask]
+
+# ISO 3166 alpha-2 code to country name, built once at import
+COUNTRY_MAP = {country.alpha_2: country.name for country in pycountry.countries}
+
 # Convert country codes to full country names
+@functools.lru_cache(maxsize=4096)
 def get_country_name(code: str) -> str:
-    country_dict = {
-        'JP': 'Japan',
-        'US': 'United States',
-        'CA': 'Canada',
-        # Add more mappings as needed
-    }
-    return ", ".join(country_dict.get(c.strip(), c) for c in code.split(','))
+    codes = (c.strip() for c in code.split(','))
+    return ", ".join(COUNTRY_MAP.get(c, c) for c in codes)
+
+# Small distilled SST-2 classifier (4 layers, hidden size 312) for short genre strings
+SENTIMENT_MODEL = "philschmid/tiny-bert-sst2-distilled"
+# Version of the saved ONNX export; bump it whenever the export settings change
+ONNX_EXPORT_VERSION = 1
+# Local ONNX export used on the CPU, written on first use and keyed on the model and export version
+ONNX_MODEL_DIR = f"sentiment_onnx_{SENTIMENT_MODEL.replace('/', '--')}_v{ONNX_EXPORT_VERSION}"
 
 # Initialize sentiment analysis pipeline for genres
 @st.cache_resource
 def load_sentiment_analyzer():
-    return pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+    # Half precision on the GPU when one is available
+    if torch.cuda.is_available():
+        return pipeline("sentiment-analysis", model=SENTIMENT_MODEL, device=0, torch_dtype=torch.float16)
+    # On the CPU, run the fused ONNX graph with ONNX Runtime when optimum is installed,
+    # otherwise fall back to the plain PyTorch pipeline
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        return pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
+    model = None
+    if os.path.isdir(ONNX_MODEL_DIR):
+        try:
+            model = ORTModelForSequenceClassification.from_pretrained(ONNX_MODEL_DIR, provider="CPUExecutionProvider")
+            tokenizer = AutoTokenizer.from_pretrained(ONNX_MODEL_DIR)
+        except Exception:
+            # A saved export that cannot be loaded is discarded and rebuilt below
+            shutil.rmtree(ONNX_MODEL_DIR, ignore_errors=True)
+            model = None
+    if model is None:
+        model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True, provider="CPUExecutionProvider")
+        tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+        # Save the export next to the app so later starts skip it; a failed save only costs a re-export
+        tmp_dir = f"{ONNX_MODEL_DIR}.{os.getpid()}.tmp"
+        try:
+            model.save_pretrained(tmp_dir)
+            tokenizer.save_pretrained(tmp_dir)
+            os.replace(tmp_dir, ONNX_MODEL_DIR)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+# Classify every unique genre string so later lookups are free. All strings are tokenized once into
+# a padded batch (genre lists are short, so 32 tokens is plenty) and fed to the model in slices.
+@st.cache_data
+def analyze_all_genres(unique_genres: tuple, _sentiment_analyzer, batch_size: int = 32) -> dict:
+    model = _sentiment_analyzer.model
+    encoded = _sentiment_analyzer.tokenizer(list(unique_genres), padding=True, truncation=True, max_length=32, return_tensors="pt")
+    labels = []
+    with torch.inference_mode():
+        for start in range(0, len(unique_genres), batch_size):
+            batch = {name: tensor[start:start + batch_size].to(model.device) for name, tensor in encoded.items()}
+            predictions = model(**batch).logits.argmax(dim=-1).tolist()
+            labels.extend(model.config.id2label[prediction] for prediction in predictions)
+    return dict(zip(unique_genres, labels))
 
 # Interpret the sentiment to user-friendly labels
 def interpret_sentiment(sentiment: str) -> str:
+    sentiment = sentiment.upper()
     if sentiment == "POSITIVE":
         return "The genre tone suggests a generally enjoyable or light-hearted experience."
     elif sentiment == "NEGATIVE":
@@ -43,57 +252,19 @@ def interpret_sentiment(sentiment: str) -> str:
     else:
         return "The genre tone is neutral or mixed."
 
-# Get sentiment score based on genres
-def get_sentiment(genres: str, sentiment_analyzer) -> Optional[str]:
-    try:
-        result = sentiment_analyzer(genres[:512])
-        sentiment = result[0]['label']
-        return interpret_sentiment(sentiment)
-    except Exception as e:
-        st.error(f"Error during sentiment analysis: {e}")
+# Get sentiment score based on genres from the precomputed genre tones
+def get_sentiment(genres: str, genre_tones: dict) -> Optional[str]:
+    sentiment = genre_tones.get(genres)
+    if sentiment is None:
+        st.error(f"No tone analysis available for genres: {genres}")
         return None
+    return interpret_sentiment(sentiment)
 
-# Function to display IMDb rating with stars
-def get_rating_stars(rating):
-    return "⭐" * int(round(rating))
-
-# Function to create and save a compact IMDb Rating Distribution plot
-def save_imdb_rating_distribution(data, filename="imdb_distribution.png"):
-    # Create the figure and axes with a compact size
-    fig, ax = plt.subplots(figsize=(6, 4))
-    
-    # Plot the histogram of IMDb ratings
-    ax.hist(
-        data['imdbAverageRating'].dropna(),
-        bins=20,  # Increased bins for finer granularity
-        color="#4CAF50",  # Green color for visual appeal
-        edgecolor="white",
-        alpha=0.85
-    )
-    
-    # Set a descriptive title and axis labels
-    ax.set_title("Distribution of IMDb Ratings in Hulu Dataset", fontsize=10, color="#333", weight="bold", pad=10)
-    ax.set_xlabel("IMDb Rating (Out of 10)", fontsize=8, color="#555", labelpad=5)
-    ax.set_ylabel("Number of Titles", fontsize=8, color="#555", labelpad=5)
-    
-    # Customize tick parameters for a cleaner look
-    ax.tick_params(axis='both', which='major', labelsize=6, colors="#555")
-    
-    # Remove unnecessary spines for a modern design
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_visible(False)
-    
-    # Hide y-axis ticks for a simplified appearance
-    ax.yaxis.set_ticks([])
-
-    # Adjust layout to ensure everything fits within the figure area
-    fig.tight_layout()
-    
-    # Save the figure to the specified filename with a set DPI for clarity
-    fig.savefig(filename, dpi=100)
-    plt.close(fig)  # Close the figure to free memory
-
+# Prebinned IMDb rating distribution (20 bins), computed once per dataset
+@st.cache_data
+def get_rating_histogram(_data: pd.DataFrame, signature: tuple) -> pd.DataFrame:
+    counts, edges = np.histogram(_data['imdbAverageRating'].dropna().to_numpy(), bins=20)
+    return pd.DataFrame({"rating": (edges[:-1] + edges[1:]) / 2, "count": counts})
 
 # Streamlit application with single-screen layout
 def main():
@@ -102,30 +273,30 @@ def main():
     st.markdown("Explore Hulu's content library with insights on **genres**, **ratings**, **availability**, and **genre-based tone analysis**.")
 
     # Load Data
-    data = load_data("data.csv")
+    data_file = "data.csv"
+    data_signature = get_data_signature(data_file)
+    data = load_data(data_file, data_signature)
     if data.empty:
         st.write("Please ensure the file data.csv is in the current directory.")
         return
+    unique_genres = get_unique_genres(data, data_signature)
+    genre_index = get_genre_index(data, data_signature)
+    min_year, max_year, avg_rating = get_data_stats(data, data_signature)
 
     # Sidebar filters
     with st.sidebar:
         st.header("Filter Options")
-        genre_filter = st.multiselect("Select Genre(s):", data['genres'].str.split(',').explode().unique())
-        min_year, max_year = int(data['releaseYear'].min()), int(data['releaseYear'].max())
+        genre_filter = st.multiselect("Select Genre(s):", unique_genres)
         release_year_range = st.slider("Release Year Range:", min_year, max_year, (min_year, max_year))
         min_rating = st.slider("Minimum IMDb Rating:", 0.0, 10.0, 5.0)
 
         # Apply filters
-        filtered_data = data[
-            (data['genres'].apply(lambda x: any(genre in x for genre in genre_filter) if genre_filter else True)) &
-            (data['releaseYear'].between(*release_year_range)) &
-            (data['imdbAverageRating'] >= min_rating)
-        ]
+        filtered_data = filter_data(data, genre_index, genre_filter, release_year_range, min_rating)
 
         title_selection = st.selectbox("Select a Title to Explore:", filtered_data['title'].unique())
     
-    # Retrieve content details for the selected title
-    selected_content = filtered_data[filtered_data['title'] == title_selection].iloc[0]
+    # Retrieve content details for the selected title as a plain dict for cheap field access
+    selected_content = filtered_data.loc[filtered_data['title'] == title_selection].iloc[0].to_dict()
     
     # Translate country code(s) to full name(s)
     country_names = get_country_name(selected_content['availableCountries'])
@@ -140,7 +311,7 @@ def main():
             <h2 style='color:#2c3e50;'>{selected_content['title']}</h2>
             <p><strong>Type:</strong> {selected_content['type']} | <strong>Genres:</strong> {selected_content['genres']}</p>
             <p><strong>Release Year:</strong> {selected_content['releaseYear']} | 
-            <strong>IMDb Rating:</strong> {selected_content['imdbAverageRating']:.1f} {get_rating_stars(selected_content['imdbAverageRating'])}
+            <strong>IMDb Rating:</strong> {selected_content['imdbAverageRating']:.1f} {selected_content['stars']}
             ({int(selected_content['imdbNumVotes']) if not pd.isna(selected_content['imdbNumVotes']) else 'N/A'} votes)</p>
             <p><strong>Available in:</strong> {country_names}</p>
             <p>{imdb_link_html}</p>
@@ -148,7 +319,6 @@ def main():
     """, unsafe_allow_html=True)
 
     # Compare rating to average
-    avg_rating = data['imdbAverageRating'].mean()
     rating_diff = selected_content['imdbAverageRating'] - avg_rating
     comparison_text = "above average" if rating_diff > 0 else "below average"
     st.write(f"Rating is {abs(rating_diff):.1f} points {comparison_text} compared to other titles.")
@@ -157,25 +327,35 @@ def main():
     st.subheader("Genre-Based Tone Analysis")
     sentiment_analyzer = load_sentiment_analyzer()
     if st.button("Analyze Genre Tone"):
+        # The first click classifies every genre combination in one batch; later clicks hit the cache
+        try:
+            genre_tones = analyze_all_genres(tuple(data['genres'].cat.categories), sentiment_analyzer)
+        except Exception as e:
+            st.error(f"Error during sentiment analysis: {e}")
+            genre_tones = {}
         genres = selected_content['genres']
-        sentiment_interpretation = get_sentiment(genres, sentiment_analyzer)
+        sentiment_interpretation = get_sentiment(genres, genre_tones) if genre_tones else None
         if sentiment_interpretation:
             st.markdown(f"<p style='color:#2c3e50; font-size:1.1em;'>{sentiment_interpretation}</p>", unsafe_allow_html=True)
 
     # Similar Titles Suggestions
-    similar_titles = data[(data['genres'] == selected_content['genres']) & 
-                          (data['imdbAverageRating'] >= selected_content['imdbAverageRating'] - 0.5) &
-                          (data['title'] != selected_content['title'])]
+    similar_titles = find_similar_titles(data, selected_content)
     
     if not similar_titles.empty:
         st.subheader("You Might Also Like:")
         for _, row in similar_titles.head(3).iterrows():  # Limit to 3 suggestions
             st.markdown(f"- {row['title']} ({int(row['releaseYear'])}) - IMDb Rating: {row['imdbAverageRating']}")
 
-    # IMDb Rating Distribution with compact size
+    # IMDb Rating Distribution
     st.subheader("IMDb Rating Distribution")
-    save_imdb_rating_distribution(data, filename="imdb_distribution.png")
-    st.image("imdb_distribution.png", width=500)  # Display image with controlled width
+    st.bar_chart(
+        get_rating_histogram(data, data_signature),
+        x="rating",
+        y="count",
+        x_label="IMDb Rating (Out of 10)",
+        y_label="Number of Titles",
+        color="#4CAF50",
+    )
 
 # Run the application
 if __name__ == "__main__":